@@ -4,17 +4,22 @@ import os
 import sys
 import json
 import time
+import signal
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from tqdm import tqdm
 import pandas as pd
 from src.config.config_loader import load_config
 from src.processors.file_processor import read_file, save_qa_pairs
+from src.processors.file_index import FileIndex
 from src.utils.text_utils import split_text
 
 class LLMClient:
     """LLM API客户端"""
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, pool_size: int = 10):
         self.api_url = config['api_url']
         self.model_name = config['model_name']
         self.timeout = config.get('timeout', 30)
@@ -27,6 +32,12 @@ class LLMClient:
         if 'api_key' in config and config['api_key']:
             self.headers["Authorization"] = f"Bearer {config['api_key']}"
         
+        # 复用HTTP连接池，避免每次请求重新建立连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
         # 打印配置信息（调试用）
         print(f"\nAPI配置信息:")
         print(f"- API地址: {self.api_url}")
@@ -58,7 +69,7 @@ class LLMClient:
                 print(f"- 模型: {self.model_name}")
                 print(f"- 消息数量: {len(messages)}")
                 
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
                     headers=self.headers,
                     json={
@@ -134,47 +145,57 @@ class LLMClient:
         
         return None, f"达到最大重试次数 ({self.max_retries})"
 
-def save_failed_tasks(failed_files: list, output_dir: str):
-    """保存失败任务清单到Markdown文件和Excel表格
+def count_error_types(failed_files: list) -> dict:
+    """统计失败记录的错误类型
     
     Args:
         failed_files: 失败文件列表，每个元素为 (文件路径, 错误信息, 模型响应)
-        output_dir: 输出目录
+    
+    Returns:
+        dict: {错误类型: 数量}
     """
-    if not failed_files:
-        return
+    error_types = {}
+    for _, error, _ in failed_files:
+        error_type = error.split(':')[0] if ':' in error else error
+        error_types[error_type] = error_types.get(error_type, 0) + 1
+    return error_types
+
+def write_failed_entries(f, failed_files: list) -> None:
+    """将失败记录写入Markdown文件
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    failed_tasks_md = os.path.join(output_dir, f"failed_tasks_{timestamp}.md")
-    failed_tasks_excel = os.path.join(output_dir, f"failed_tasks_{timestamp}.xlsx")
+    Args:
+        f: 已打开的Markdown文件对象
+        failed_files: 失败文件列表，每个元素为 (文件路径, 错误信息, 模型响应)
+    """
+    for file_path, error, model_response in failed_files:
+        f.write(f"### {os.path.basename(file_path)}\n\n")
+        f.write(f"- 文件路径: `{file_path}`\n")
+        f.write(f"- 错误信息: {error}\n")
+        if model_response:
+            f.write("\n#### 模型返回内容\n\n")
+            f.write("```\n")
+            f.write(model_response)
+            f.write("\n```\n\n")
+
+def write_error_stats(f, error_types: dict) -> None:
+    """将错误类型统计写入Markdown文件
     
-    # 保存为Markdown文件
-    with open(failed_tasks_md, 'w', encoding='utf-8') as f:
-        f.write("# 失败任务清单\n\n")
-        f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        f.write("## 失败文件列表\n\n")
-        
-        for file_path, error, model_response in failed_files:
-            f.write(f"### {os.path.basename(file_path)}\n\n")
-            f.write(f"- 文件路径: `{file_path}`\n")
-            f.write(f"- 错误信息: {error}\n")
-            if model_response:
-                f.write("\n#### 模型返回内容\n\n")
-                f.write("```\n")
-                f.write(model_response)
-                f.write("\n```\n\n")
-        
-        f.write("## 失败原因统计\n\n")
-        # 统计错误类型
-        error_types = {}
-        for _, error, _ in failed_files:
-            error_type = error.split(':')[0] if ':' in error else error
-            error_types[error_type] = error_types.get(error_type, 0) + 1
-        
-        for error_type, count in error_types.items():
-            f.write(f"- {error_type}: {count}个文件\n")
+    Args:
+        f: 已打开的Markdown文件对象
+        error_types: {错误类型: 数量}
+    """
+    f.write("## 失败原因统计\n\n")
+    for error_type, count in error_types.items():
+        f.write(f"- {error_type}: {count}个文件\n")
+
+def save_failed_tasks_excel(failed_files: list, error_types: dict, failed_tasks_excel: str) -> None:
+    """保存失败任务清单到Excel表格
     
-    # 保存为Excel文件
+    Args:
+        failed_files: 失败文件列表，每个元素为 (文件路径, 错误信息, 模型响应)
+        error_types: {错误类型: 数量}
+        failed_tasks_excel: Excel文件路径
+    """
     df = pd.DataFrame([
         {
             '文件名': os.path.basename(file_path),
@@ -195,11 +216,200 @@ def save_failed_tasks(failed_files: list, output_dir: str):
     with pd.ExcelWriter(failed_tasks_excel, engine='openpyxl') as writer:
         df.to_excel(writer, sheet_name='失败文件列表', index=False)
         error_stats.to_excel(writer, sheet_name='错误统计', index=False)
+
+def save_failed_tasks(failed_files: list, output_dir: str):
+    """保存失败任务清单到Markdown文件和Excel表格
+    
+    Args:
+        failed_files: 失败文件列表，每个元素为 (文件路径, 错误信息, 模型响应)
+        output_dir: 输出目录
+    """
+    if not failed_files:
+        return
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    failed_tasks_md = os.path.join(output_dir, f"failed_tasks_{timestamp}.md")
+    failed_tasks_excel = os.path.join(output_dir, f"failed_tasks_{timestamp}.xlsx")
+    error_types = count_error_types(failed_files)
+    
+    # 保存为Markdown文件
+    with open(failed_tasks_md, 'w', encoding='utf-8') as f:
+        f.write("# 失败任务清单\n\n")
+        f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("## 失败文件列表\n\n")
+        write_failed_entries(f, failed_files)
+        write_error_stats(f, error_types)
+    
+    # 保存为Excel文件
+    save_failed_tasks_excel(failed_files, error_types, failed_tasks_excel)
     
     print(f"\n失败任务清单已保存到:")
     print(f"- Markdown文件: {failed_tasks_md}")
     print(f"- Excel文件: {failed_tasks_excel}")
 
+class FailureReport:
+    """守护模式的滚动失败报告
+    
+    失败记录实时追加到Markdown文件，条数达到上限或跨天时轮换到新文件，
+    统计信息和Excel表格在轮换或关闭时写入，内存中只保留当前报告的记录。
+    """
+    def __init__(self, output_dir: str, max_entries: int = 500):
+        self.output_dir = output_dir
+        self.max_entries = max_entries
+        self.entries = []
+        self.report_date = None
+        self.report_name = None
+        self.sequence = 0
+    
+    def add(self, failed_files: list) -> None:
+        """追加失败记录
+        
+        Args:
+            failed_files: 失败文件列表，每个元素为 (文件路径, 错误信息, 模型响应)
+        """
+        for failed_file in failed_files:
+            if self.report_name and (len(self.entries) >= self.max_entries or self.report_date != datetime.now().date()):
+                self.close()
+            if not self.report_name:
+                self._open()
+            with open(os.path.join(self.output_dir, f"{self.report_name}.md"), 'a', encoding='utf-8') as f:
+                write_failed_entries(f, [failed_file])
+            self.entries.append(failed_file)
+    
+    def _open(self) -> None:
+        """创建新的报告文件"""
+        self.sequence += 1
+        self.report_date = datetime.now().date()
+        self.report_name = f"failed_tasks_daemon_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.sequence}"
+        with open(os.path.join(self.output_dir, f"{self.report_name}.md"), 'w', encoding='utf-8') as f:
+            f.write("# 失败任务清单\n\n")
+            f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write("## 失败文件列表\n\n")
+    
+    def close(self) -> None:
+        """写入统计信息和Excel表格，结束当前报告"""
+        if not self.report_name:
+            return
+        failed_tasks_md = os.path.join(self.output_dir, f"{self.report_name}.md")
+        failed_tasks_excel = os.path.join(self.output_dir, f"{self.report_name}.xlsx")
+        entries = self.entries
+        
+        # 无论写入是否成功都结束当前报告，避免记录在内存中累积
+        self.entries = []
+        self.report_name = None
+        
+        error_types = count_error_types(entries)
+        with open(failed_tasks_md, 'a', encoding='utf-8') as f:
+            write_error_stats(f, error_types)
+        save_failed_tasks_excel(entries, error_types, failed_tasks_excel)
+        
+        print(f"\n失败任务清单已保存到:")
+        print(f"- Markdown文件: {failed_tasks_md}")
+        print(f"- Excel文件: {failed_tasks_excel}")
+
+def process_file(file_path: str, output_dir: str, config: dict, llm_client: LLMClient, show_progress: bool = True) -> tuple:
+    """处理单个文件
+    
+    Args:
+        file_path: 文件路径
+        output_dir: 输出目录
+        config: 配置信息
+        llm_client: LLM客户端
+        show_progress: 是否显示文本块进度条
+    
+    Returns:
+        tuple: (成功保存的问答对数量, 失败记录列表)
+    """
+    failed_files = []
+    try:
+        print(f"\n开始处理文件: {file_path}")
+        
+        # 读取文件
+        try:
+            text = read_file(file_path)
+            if not text:
+                print(f"文件内容为空: {file_path}")
+                failed_files.append((file_path, "文件内容为空", None))
+                return 0, failed_files
+        except Exception as e:
+            print(f"读取文件失败: {str(e)}")
+            failed_files.append((file_path, f"读取文件失败: {str(e)}", None))
+            return 0, failed_files
+        
+        # 计算每个块的问题数量
+        chunks = split_text(text, config)
+        total_chunks = len(chunks)
+        if total_chunks == 0:
+            print(f"文件分块后为空: {file_path}")
+            failed_files.append((file_path, "文件分块后为空", None))
+            return 0, failed_files
+        
+        questions_per_file = config['processing']['questions_per_file']
+        questions_per_chunk = questions_per_file // total_chunks
+        remainder = questions_per_file % total_chunks
+        
+        print(f"文件将被分为 {total_chunks} 个块处理")
+        print(f"每个块生成 {questions_per_chunk} 个问题")
+        if remainder > 0:
+            print(f"最后一个块额外生成 {remainder} 个问题")
+        
+        # 生成问答对
+        qa_pairs = []
+        for i, chunk in enumerate(tqdm(chunks, desc=f"处理 {os.path.basename(file_path)} 的文本块", leave=False, disable=not show_progress)):
+            # 为最后一个块分配剩余的问题
+            current_questions = questions_per_chunk + (1 if i == total_chunks - 1 and remainder > 0 else 0)
+            
+            # 构建消息
+            system_prompt = config['prompts']['system_prompt_template'].format(questions_count=current_questions)
+            user_prompt = config['prompts']['user_prompt_template'].format(text=chunk)
+            
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            
+            # 调用API
+            response, error = llm_client.generate_response(messages)
+            if error:
+                print(f"\n处理文件 {file_path} 的第 {i+1} 个文本块时出错: {error}")
+                failed_files.append((file_path, error, response))
+                continue
+            
+            try:
+                # 解析返回的JSON
+                chunk_qa_pairs = json.loads(response)
+                if not isinstance(chunk_qa_pairs, list):
+                    raise ValueError("API返回的不是问答对列表")
+                qa_pairs.extend(chunk_qa_pairs)
+            except json.JSONDecodeError as e:
+                print(f"\n解析JSON时出错: {str(e)}")
+                failed_files.append((file_path, f"JSON解析错误: {str(e)}", response))
+                continue
+            except ValueError as e:
+                print(f"\n验证问答对格式时出错: {str(e)}")
+                failed_files.append((file_path, f"问答对格式错误: {str(e)}", response))
+                continue
+        
+        if qa_pairs:
+            # 保存结果
+            output_file = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}_qa.csv")
+            try:
+                save_qa_pairs(qa_pairs, output_file)
+                print(f"成功保存 {len(qa_pairs)} 个问答对到: {output_file}")
+                return len(qa_pairs), failed_files
+            except Exception as e:
+                print(f"保存问答对失败: {str(e)}")
+                failed_files.append((file_path, f"保存问答对失败: {str(e)}", None))
+        else:
+            print(f"未能生成任何问答对: {file_path}")
+            failed_files.append((file_path, "未能生成任何问答对", None))
+    
+    except Exception as e:
+        print(f"处理文件 {file_path} 时出错: {str(e)}")
+        failed_files.append((file_path, str(e), None))
+    
+    return 0, failed_files
+
 def process_files(input_dir: str, output_dir: str, config: dict) -> None:
     """处理目录中的所有文件
     
@@ -212,11 +422,7 @@ def process_files(input_dir: str, output_dir: str, config: dict) -> None:
     os.makedirs(output_dir, exist_ok=True)
     
     # 获取所有文件
-    files = []
-    for root, _, filenames in os.walk(input_dir):
-        for filename in filenames:
-            if filename.endswith(tuple(config['processing']['supported_extensions'])):
-                files.append(os.path.join(root, filename))
+    files = sorted(FileIndex(input_dir, config['processing']['supported_extensions']).scan())
     
     if not files:
         print(f"在 {input_dir} 中没有找到支持的文件")
@@ -235,102 +441,231 @@ def process_files(input_dir: str, output_dir: str, config: dict) -> None:
     # 处理每个文件
     failed_files = []
     for file_path in tqdm(files, desc="处理文件"):
-        try:
-            print(f"\n开始处理文件: {file_path}")
-            
-            # 读取文件
+        _, file_failures = process_file(file_path, output_dir, config, llm_client)
+        failed_files.extend(file_failures)
+    
+    # 保存失败任务清单
+    if failed_files:
+        print(f"\n有 {len(failed_files)} 个文件处理失败")
+        save_failed_tasks(failed_files, output_dir)
+    else:
+        print("\n所有文件处理成功！")
+
+class DaemonStatus:
+    """守护模式运行状态，定期写入状态文件"""
+    def __init__(self, status_file: str, input_dir: str):
+        self.status_file = status_file
+        self.stats = {
+            "pid": os.getpid(),
+            "input_dir": input_dir,
+            "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_at": None,
+            "tracked_files": 0,
+            "queued_files": 0,
+            "running_files": 0,
+            "processed_files": 0,
+            "failed_files": 0,
+            "qa_pairs": 0,
+            "last_file": None,
+            "last_finished_at": None,
+            "avg_latency_seconds": 0.0
+        }
+        self.total_latency = 0.0
+    
+    def record(self, file_path: str, qa_count: int, failed: bool, latency: float) -> None:
+        """记录一个文件的处理结果
+        
+        Args:
+            file_path: 文件路径
+            qa_count: 成功保存的问答对数量
+            failed: 是否未能生成任何问答对
+            latency: 从发现文件到处理完成的耗时（秒）
+        """
+        if failed:
+            self.stats["failed_files"] += 1
+        else:
+            self.stats["processed_files"] += 1
+        self.stats["qa_pairs"] += qa_count
+        self.stats["last_file"] = file_path
+        self.stats["last_finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        self.total_latency += latency
+        finished = self.stats["processed_files"] + self.stats["failed_files"]
+        self.stats["avg_latency_seconds"] = round(self.total_latency / finished, 3)
+    
+    def write(self, tracked: int, queued: int, running: int) -> None:
+        """更新队列信息并写入状态文件
+        
+        Args:
+            tracked: 已索引的文件数量
+            queued: 等待处理的文件数量
+            running: 正在处理的文件数量
+        """
+        self.stats["tracked_files"] = tracked
+        self.stats["queued_files"] = queued
+        self.stats["running_files"] = running
+        self.stats["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # 先写临时文件再替换，避免读取方看到不完整的内容
+        temp_file = f"{self.status_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.status_file)
+
+def run_daemon(input_dir: str, output_dir: str, config: dict) -> None:
+    """以守护模式持续监听输入目录，处理新增或修改的文件
+    
+    Args:
+        input_dir: 输入目录
+        output_dir: 输出目录
+        config: 配置信息
+    """
+    daemon_config = config.get('daemon') or {}
+    poll_interval = daemon_config.get('poll_interval', 2)
+    max_workers = daemon_config.get('max_workers', 2)
+    retry_delay = daemon_config.get('retry_delay', 60)
+    max_retry_delay = daemon_config.get('max_retry_delay', 3600)
+    max_retries = daemon_config.get('max_retries', 5)
+    status_file = daemon_config.get('status_file') or os.path.join(output_dir, "daemon_status.json")
+    index_file = os.path.join(os.path.dirname(status_file), "daemon_index.json")
+    
+    # 确保输出目录存在
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(input_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(status_file) or ".", exist_ok=True)
+    
+    # 创建LLM客户端，整个运行期间复用
+    try:
+        llm_client = LLMClient(config['llm'], pool_size=max_workers)
+    except Exception as e:
+        print(f"创建LLM客户端失败: {str(e)}")
+        return
+    
+    # 文件签名需保持一个轮询间隔不变才会被处理，避免读取仍在写入中的文件
+    index = FileIndex(input_dir, config['processing']['supported_extensions'], settle_time=poll_interval)
+    if index.load(index_file):
+        print(f"已加载文件索引: {index_file}，仅处理上次运行后新增或修改的文件")
+    elif not daemon_config.get('process_existing', True):
+        index.seed()
+    
+    status = DaemonStatus(status_file, input_dir)
+    report = FailureReport(output_dir, daemon_config.get('report_max_entries', 500))
+    
+    print(f"\n守护模式已启动，监听目录: {input_dir}")
+    print(f"- 轮询间隔: {poll_interval}秒")
+    print(f"- 最大并发数: {max_workers}")
+    print(f"- 状态文件: {status_file}")
+    print(f"- 索引文件: {index_file}")
+    
+    # 正在处理的任务 {future: (文件路径, 提交时间)}
+    in_flight = {}
+    # 上次保存索引时排除的文件，变化时需要重新保存
+    saved_exclude = None
+    
+    def collect_finished() -> None:
+        """收集已完成的任务，更新统计并写入失败报告"""
+        failed_files = []
+        for future in [f for f in in_flight if f.done() and not f.cancelled()]:
+            file_path, submitted_at = in_flight.pop(future)
             try:
-                text = read_file(file_path)
-                if not text:
-                    print(f"文件内容为空: {file_path}")
-                    failed_files.append((file_path, "文件内容为空", None))
-                    continue
+                qa_count, file_failures = future.result()
             except Exception as e:
-                print(f"读取文件失败: {str(e)}")
-                failed_files.append((file_path, f"读取文件失败: {str(e)}", None))
-                continue
+                qa_count, file_failures = 0, [(file_path, str(e), None)]
+            status.record(file_path, qa_count, qa_count == 0, time.time() - submitted_at)
+            failed_files.extend(file_failures)
             
-            # 计算每个块的问题数量
-            chunks = split_text(text)
-            total_chunks = len(chunks)
-            if total_chunks == 0:
-                print(f"文件分块后为空: {file_path}")
-                failed_files.append((file_path, "文件分块后为空", None))
+            if qa_count > 0:
+                index.record_success(file_path)
                 continue
-                
-            questions_per_file = config['processing']['questions_per_file']
-            questions_per_chunk = questions_per_file // total_chunks
-            remainder = questions_per_file % total_chunks
             
-            print(f"文件将被分为 {total_chunks} 个块处理")
-            print(f"每个块生成 {questions_per_chunk} 个问题")
-            if remainder > 0:
-                print(f"最后一个块额外生成 {remainder} 个问题")
+            # 未生成问答对的文件按指数退避重试，超过重试次数后本次运行不再处理
+            attempts = index.failure_count(file_path) + 1
+            if attempts > max_retries:
+                print(f"文件 {file_path} 已连续失败 {attempts} 次，不再重试")
+                index.record_failure(file_path, None)
+            else:
+                delay = min(retry_delay * 2 ** (attempts - 1), max_retry_delay)
+                print(f"文件 {file_path} 处理失败，将在 {delay} 秒后第 {attempts} 次重试")
+                index.record_failure(file_path, delay)
+        
+        if failed_files:
+            try:
+                report.add(failed_files)
+            except Exception as e:
+                print(f"保存失败任务清单失败: {str(e)}")
+    
+    def write_state() -> None:
+        """写入状态文件，已处理文件有变化时写入文件索引"""
+        nonlocal saved_exclude
+        running = sum(1 for f in in_flight if f.running())
+        queued = sum(1 for f in in_flight if not f.running() and not f.done())
+        try:
+            status.write(len(index.known), queued, running)
+        except Exception as e:
+            print(f"写入状态文件失败: {str(e)}")
+        
+        # 尚未处理完成的文件不写入索引
+        exclude = {file_path for file_path, _ in in_flight.values()}
+        if not index.dirty and exclude == saved_exclude:
+            return
+        try:
+            index.save(index_file, exclude=exclude)
+            saved_exclude = exclude
+        except Exception as e:
+            print(f"写入索引文件失败: {str(e)}")
+    
+    def handle_sigterm(signum, frame):
+        """将SIGTERM转换为KeyboardInterrupt，与Ctrl-C使用相同的退出流程"""
+        raise KeyboardInterrupt
+    
+    previous_sigterm = signal.signal(signal.SIGTERM, handle_sigterm)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while True:
+            collect_finished()
             
-            # 生成问答对
-            qa_pairs = []
-            for i, chunk in enumerate(tqdm(chunks, desc=f"处理 {os.path.basename(file_path)} 的文本块", leave=False)):
-                # 为最后一个块分配剩余的问题
-                current_questions = questions_per_chunk + (1 if i == total_chunks - 1 and remainder > 0 else 0)
-                
-                # 构建消息
-                system_prompt = config['prompts']['system_prompt_template'].format(questions_count=current_questions)
-                user_prompt = config['prompts']['user_prompt_template'].format(text=chunk)
-                
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-                
-                # 调用API
-                response, error = llm_client.generate_response(messages)
-                if error:
-                    print(f"\n处理文件 {file_path} 的第 {i+1} 个文本块时出错: {error}")
-                    failed_files.append((file_path, error, response))
-                    continue
-                
-                try:
-                    # 解析返回的JSON
-                    chunk_qa_pairs = json.loads(response)
-                    if not isinstance(chunk_qa_pairs, list):
-                        raise ValueError("API返回的不是问答对列表")
-                    qa_pairs.extend(chunk_qa_pairs)
-                except json.JSONDecodeError as e:
-                    print(f"\n解析JSON时出错: {str(e)}")
-                    failed_files.append((file_path, f"JSON解析错误: {str(e)}", response))
-                    continue
-                except ValueError as e:
-                    print(f"\n验证问答对格式时出错: {str(e)}")
-                    failed_files.append((file_path, f"问答对格式错误: {str(e)}", response))
+            # 提交新增或修改的文件
+            busy = {file_path for file_path, _ in in_flight.values()}
+            for file_path in index.poll():
+                if file_path in busy:
+                    # 文件在处理过程中被修改，待当前任务结束后重新处理
+                    index.forget(file_path)
                     continue
+                print(f"\n发现新文件: {file_path}")
+                future = executor.submit(process_file, file_path, output_dir, config, llm_client, False)
+                in_flight[future] = (file_path, time.time())
             
-            if qa_pairs:
-                # 保存结果
-                output_file = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}_qa.csv")
-                try:
-                    save_qa_pairs(qa_pairs, output_file)
-                    print(f"成功保存 {len(qa_pairs)} 个问答对到: {output_file}")
-                except Exception as e:
-                    print(f"保存问答对失败: {str(e)}")
-                    failed_files.append((file_path, f"保存问答对失败: {str(e)}", None))
-            else:
-                print(f"未能生成任何问答对: {file_path}")
-                failed_files.append((file_path, "未能生成任何问答对", None))
+            write_state()
             
+            if in_flight:
+                wait(list(in_flight), timeout=poll_interval, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("\n收到中断信号，等待正在处理的文件完成...")
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+        
+        # 记录最后完成的任务，被取消的文件下次启动时重新处理
+        collect_finished()
+        for future, (file_path, _) in list(in_flight.items()):
+            index.forget(file_path)
+            del in_flight[future]
+        write_state()
+        try:
+            report.close()
         except Exception as e:
-            print(f"处理文件 {file_path} 时出错: {str(e)}")
-            failed_files.append((file_path, str(e), None))
-            continue
-    
-    # 保存失败任务清单
-    if failed_files:
-        print(f"\n有 {len(failed_files)} 个文件处理失败")
-        save_failed_tasks(failed_files, output_dir)
-    else:
-        print("\n所有文件处理成功！")
+            print(f"保存失败任务清单失败: {str(e)}")
+        signal.signal(signal.SIGTERM, previous_sigterm)
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="QA-Extractor 文档问答对提取工具")
+    parser.add_argument("--watch", action="store_true", help="以守护模式运行，持续处理输入目录中新增或修改的文件")
+    args = parser.parse_args()
+    
     try:
         # 加载配置
         config = load_config()
@@ -340,11 +675,14 @@ def main():
         output_dir = config['paths']['output_dir']
         
         # 处理文件
-        process_files(input_dir, output_dir, config)
-        
+        if args.watch:
+            run_daemon(input_dir, output_dir, config)
+        else:
+            process_files(input_dir, output_dir, config)
+    
     except Exception as e:
         print(f"程序执行出错: {str(e)}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,193 @@
+"""文件索引模块
+
+通过轮询目录并比较文件的修改时间和大小来发现新增或修改的文件，
+不读取文件内容，因此未变化的文件不会被重新哈希。
+"""
+import os
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+class FileIndex:
+    """输入目录的轮询索引"""
+    def __init__(self, input_dir: str, supported_extensions: list, settle_time: float = 0):
+        self.input_dir = input_dir
+        self.supported_extensions = tuple(supported_extensions)
+        # 文件签名需要保持不变的最短时间（秒），用于等待文件写入完成
+        self.settle_time = settle_time
+
+        # 已提交处理的文件签名 {文件路径: (修改时间, 文件大小)}
+        self.known: Dict[str, Tuple[int, int]] = {}
+        # 已发现但尚未稳定的文件 {文件路径: (文件签名, 首次发现该签名的时间)}
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # 处理失败的文件 {文件路径: (文件签名, 失败次数, 下次重试时间)}，下次重试时间为None表示不再重试
+        self.failures: Dict[str, Tuple[Tuple[int, int], int, Optional[float]]] = {}
+        # 已处理文件记录是否有未保存的变化
+        self.dirty = False
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """扫描输入目录，获取所有支持文件的签名
+
+        Returns:
+            Dict[str, Tuple[int, int]]: {文件路径: (修改时间, 文件大小)}
+        """
+        signatures = {}
+        for root, _, filenames in os.walk(self.input_dir):
+            for filename in filenames:
+                if not filename.endswith(self.supported_extensions):
+                    continue
+                file_path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    # 文件可能在扫描过程中被删除
+                    continue
+                signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def seed(self) -> None:
+        """将当前目录中的文件全部标记为已处理"""
+        self.known = self.scan()
+        self.pending = {}
+        self.dirty = True
+
+    def poll(self) -> List[str]:
+        """检测新增或修改且已写入完成的文件
+
+        文件签名需要至少保持 settle_time 秒不变才会被返回，
+        以避免处理仍在写入中的文件。处理失败且未到重试时间的文件会被跳过。
+
+        Returns:
+            List[str]: 需要处理的文件路径列表
+        """
+        signatures = self.scan()
+        now = time.monotonic()
+        ready = []
+        pending = {}
+        for file_path, signature in signatures.items():
+            if self.known.get(file_path) == signature:
+                continue
+            failure = self.failures.get(file_path)
+            if failure is not None:
+                if failure[0] != signature:
+                    # 失败后文件被修改，按新文件重新处理
+                    del self.failures[file_path]
+                elif failure[2] is None or now < failure[2]:
+                    continue
+            previous = self.pending.get(file_path)
+            if previous is None or previous[0] != signature:
+                # 新发现的文件或签名发生变化，重新开始计时
+                pending[file_path] = (signature, now)
+            elif now - previous[1] >= self.settle_time:
+                self.known[file_path] = signature
+                self.dirty = True
+                ready.append(file_path)
+            else:
+                pending[file_path] = previous
+        self.pending = pending
+
+        # 移除已删除的文件，使其重新出现时能被再次处理
+        for file_path in list(self.known):
+            if file_path not in signatures:
+                del self.known[file_path]
+                self.dirty = True
+        for file_path in list(self.failures):
+            if file_path not in signatures:
+                del self.failures[file_path]
+
+        return sorted(ready)
+
+    def forget(self, file_path: str) -> None:
+        """移除文件记录，使其在下次轮询时被重新处理
+
+        Args:
+            file_path: 文件路径
+        """
+        if self.known.pop(file_path, None) is not None:
+            self.dirty = True
+
+    def failure_count(self, file_path: str) -> int:
+        """获取文件当前版本的连续失败次数
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            int: 失败次数，文件在失败后被修改时重新计数
+        """
+        failure = self.failures.get(file_path)
+        if failure is None or failure[0] != self.known.get(file_path):
+            return 0
+        return failure[1]
+
+    def record_failure(self, file_path: str, retry_delay: Optional[float]) -> None:
+        """记录文件处理失败，失败的文件不会写入索引文件
+
+        Args:
+            file_path: 文件路径
+            retry_delay: 重试等待时间（秒），为None表示本次运行中不再重试
+        """
+        signature = self.known.get(file_path)
+        if signature is None:
+            # 文件在处理过程中被修改或删除，轮询时会按新文件处理
+            return
+        attempts = self.failure_count(file_path) + 1
+        if retry_delay is None:
+            self.failures[file_path] = (signature, attempts, None)
+        else:
+            self.failures[file_path] = (signature, attempts, time.monotonic() + retry_delay)
+            del self.known[file_path]
+        self.dirty = True
+
+    def record_success(self, file_path: str) -> None:
+        """清除文件的失败记录
+
+        Args:
+            file_path: 文件路径
+        """
+        if self.failures.pop(file_path, None) is not None:
+            self.dirty = True
+
+    def load(self, index_file: str) -> bool:
+        """从索引文件加载已处理文件的签名
+
+        Args:
+            index_file: 索引文件路径
+
+        Returns:
+            bool: 索引文件是否存在并加载成功
+        """
+        if not os.path.exists(index_file):
+            return False
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            known = {file_path: tuple(signature) for file_path, signature in data.items()}
+        except Exception as e:
+            print(f"读取索引文件失败: {str(e)}")
+            return False
+        self.known = known
+        self.pending = {}
+        self.dirty = False
+        return True
+
+    def save(self, index_file: str, exclude: set = None) -> None:
+        """将已处理文件的签名保存到索引文件，处理失败的文件不写入
+
+        Args:
+            index_file: 索引文件路径
+            exclude: 不写入索引的文件路径集合（如尚未处理完成的文件）
+        """
+        exclude = exclude or set()
+        data = {
+            file_path: list(signature)
+            for file_path, signature in self.known.items()
+            if file_path not in exclude and file_path not in self.failures
+        }
+
+        # 先写临时文件再替换，避免中断时留下不完整的索引
+        temp_file = f"{index_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_file, index_file)
+        self.dirty = False
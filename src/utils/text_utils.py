@@ -1,9 +1,25 @@
 """文本处理工具模块"""
 import re
 import unicodedata
+from functools import lru_cache
 import tiktoken
 from ..config.config_loader import load_config
 
+@lru_cache(maxsize=None)
+def get_encoding(model: str = "gpt-3.5-turbo"):
+    """获取并缓存模型对应的tiktoken编码器
+    
+    Args:
+        model: 使用的模型名称
+        
+    Returns:
+        编码器对象
+        
+    Raises:
+        Exception: 编码器加载失败时抛出，失败结果不会被缓存
+    """
+    return tiktoken.encoding_for_model(model)
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """计算文本的token数量
     
@@ -15,7 +31,7 @@ def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
         int: token数量
     """
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        encoding = get_encoding(model)
         return len(encoding.encode(text))
     except:
         # 如果无法使用tiktoken，使用简单的估算方法
@@ -59,17 +75,19 @@ def clean_for_excel(text) -> str:
     
     return cleaned_text
 
-def split_text(text: str) -> list:
+def split_text(text: str, config: dict = None) -> list:
     """将长文本分割成不超过最大token数的片段
     
     Args:
         text: 要分割的文本
+        config: 配置信息，为空时从配置文件加载
         
     Returns:
         List[str]: 分割后的文本片段列表
     """
     # 从配置文件加载参数
-    config = load_config()
+    if config is None:
+        config = load_config()
     max_tokens = config['processing']['text_chunking']['max_tokens']
     overlap_tokens = config['processing']['text_chunking']['overlap_tokens']
     